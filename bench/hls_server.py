@@ -0,0 +1,191 @@
+# coding: utf8
+"""벤치마크용 로컬 HLS 서버.
+
+합성 스트림: 평문 / AES-128 (키 로테이션 선택), 세그먼트 수·크기, 응답 지연, 오류 주입을 설정할 수 있습니다.
+--byterange면 모든 세그먼트를 파일 하나(stream.ts)에 이어 붙이고 #EXT-X-BYTERANGE로 가리킵니다 (Range 요청 지원).
+MissAV 형식의 p.a.c.k.e.r 페이지(/page/ID)도 함께 제공해 분석→다운로드 스케줄러 전체를 오프라인으로 돌릴 수 있습니다.
+
+    python bench/hls_server.py --segments 200 --size 188000 --encrypt aes --rotate 50 --latency-ms 20 --error-rate 0.02
+"""
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+try:
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+except ImportError: # 평문 스트림만 가능
+    Cipher = None
+
+TS_PACKET_SIZE = 188
+PACKER_ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+VARIANTS = ((640, 360, 800_000), (854, 480, 1_400_000), (1280, 720, 2_800_000), (1920, 1080, 5_000_000))
+
+def synthetic_ts(size, seed):
+    """0x47 동기 바이트로 시작하는 188바이트 널 패킷(PID 0x1FFF)을 size에 맞춰 이어 붙입니다. 내용은 seed로 결정됩니다."""
+    packets = max(1, size // TS_PACKET_SIZE)
+    filler = hashlib.sha256(str(seed).encode()).digest() * 6
+    packet = b"\x47\x1f\xff\x10" + filler[:TS_PACKET_SIZE - 4]
+    return packet * packets
+
+def pkcs7_encrypt(key, iv, data):
+    pad = 16 - len(data) % 16
+    encryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).encryptor()
+    return encryptor.update(data + bytes([pad]) * pad) + encryptor.finalize()
+
+def _packer_encode(num, radix):
+    return ('' if num < radix else _packer_encode(num // radix, radix)) + PACKER_ALPHABET[num % radix]
+
+def pack_js(source, radix=36):
+    """Dean Edwards p.a.c.k.e.r 형식으로 JS를 감쌉니다. (단어 → radix 진법 토큰, 키워드는 '|'로 연결)"""
+    words = list(dict.fromkeys(re.findall(r"\b\w+\b", source)))
+    tokens = {word: _packer_encode(i, radix) for i, word in enumerate(words)}
+    payload = re.sub(r"\b\w+\b", lambda m: tokens[m.group(0)], source).replace("\\", "\\\\").replace("'", "\\'")
+    return ("eval(function(p,a,c,k,e,d){e=function(c){return(c<a?'':e(parseInt(c/a)))+((c=c%a)>35?String.fromCharCode(c+29):c.toString(36))};"
+            "if(!''.replace(/^/,String)){while(c--){d[e(c)]=k[c]||e(c)}k=[function(e){return d[e]}];e=function(){return'\\\\w+'};c=1};"
+            "while(c--){if(k[c]){p=p.replace(new RegExp('\\\\b'+e(c)+'\\\\b','g'),k[c])}}return p}"
+            f"('{payload}',{radix},{len(words)},'{'|'.join(words)}'.split('|'),0,{{}}))")
+
+def missav_page(m3u8_url, video_id="bench-001", radix=36, decoys=1):
+    """MissAV 영상 페이지 모양의 HTML. 실제 M3U8 앞에 광고 스크립트 같은 packed 미끼를 decoys개 둡니다."""
+    scripts = [pack_js(f"var ad{i}=document.createElement('div');ad{i}.id='banner_{i}';window.adTrack{i}=function(){{return 'https://ads.example.com/p/{i}.gif'}}", radix)
+               for i in range(decoys)]
+    scripts.append(pack_js(f"source='{m3u8_url}';source842='{m3u8_url.rsplit('/', 1)[0]}/842x480/video.m3u8';"
+                           "const player=new Plyr('#player',{ratio:'16:9'});if(Hls.isSupported()){hls.loadSource(source)}", radix))
+    body = "\n".join(f"<script type=\"text/javascript\">{s}</script>" for s in scripts)
+    return (f"<!DOCTYPE html><html lang=\"ko\"><head><meta charset=\"utf-8\"><title>{video_id.upper()} - MissAV</title></head>"
+            f"<body><div id=\"player\"></div>\n{body}\n</body></html>")
+
+class SyntheticHLS:
+    """스트림 설정. encrypt: None | "aes", rotate: 키를 바꿀 세그먼트 간격 (0이면 키 하나),
+    error_rate: 경로별 첫 요청을 503으로 돌려줄 비율 (재시도하면 성공), byterange: 세그먼트를 stream.ts 한 파일의 구간으로 제공."""
+    def __init__(self, segments=100, size=188_000, encrypt=None, rotate=0, explicit_iv=False, latency_ms=0, error_rate=0.0, target_duration=4,
+                 byterange=False):
+        if encrypt and Cipher is None: raise RuntimeError("AES 스트림에는 cryptography 패키지가 필요합니다")
+        self.segments, self.size, self.encrypt, self.rotate = segments, size, encrypt, rotate
+        self.explicit_iv, self.latency_s, self.error_rate, self.target_duration = explicit_iv, latency_ms / 1000, error_rate, target_duration
+        self.byterange = byterange; self._resource = None
+        self.payload_override = None # 예: ffmpeg로 만든 실제 TS 조각 (concat 벤치용)
+        self._failed = set(); self._lock = threading.Lock()
+        self.requests = 0; self.errors_sent = 0
+
+    def key_index(self, index):
+        return index // self.rotate if self.encrypt and self.rotate else 0
+
+    def key(self, key_index):
+        return hashlib.md5(f"bench-key-{key_index}".encode()).digest()
+
+    def iv(self, index):
+        return hashlib.md5(f"bench-iv-{index}".encode()).digest() if self.explicit_iv else index.to_bytes(16, "big")
+
+    def plain_segment(self, index):
+        return self.payload_override if self.payload_override is not None else synthetic_ts(self.size, index)
+
+    def segment(self, index):
+        data = self.plain_segment(index)
+        return pkcs7_encrypt(self.key(self.key_index(index)), self.iv(index), data) if self.encrypt else data
+
+    def resource(self):
+        """byterange 모드의 stream.ts 전체 (세그먼트별로 따로 암호화한 뒤 이어 붙임)."""
+        if self._resource is None: self._resource = b"".join(self.segment(i) for i in range(self.segments))
+        return self._resource
+
+    def master_playlist(self):
+        lines = ["#EXTM3U", "#EXT-X-VERSION:3"]
+        for width, height, bandwidth in VARIANTS:
+            lines += [f"#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},RESOLUTION={width}x{height},CODECS=\"avc1.64001f,mp4a.40.2\"", f"{height}p/video.m3u8"]
+        return "\n".join(lines) + "\n"
+
+    def media_playlist(self):
+        lines = ["#EXTM3U", "#EXT-X-VERSION:3", f"#EXT-X-TARGETDURATION:{self.target_duration}", "#EXT-X-MEDIA-SEQUENCE:0", "#EXT-X-PLAYLIST-TYPE:VOD"]
+        current_key = None
+        for index in range(self.segments):
+            if self.encrypt and (self.key_index(index) != current_key or self.explicit_iv):
+                current_key = self.key_index(index)
+                iv_attr = f",IV=0x{self.iv(index).hex()}" if self.explicit_iv else ""
+                lines.append(f"#EXT-X-KEY:METHOD=AES-128,URI=\"key{current_key}.bin\"{iv_attr}")
+            if self.byterange:
+                length = len(self.segment(index))
+                lines += [f"#EXTINF:{self.target_duration}.000,", f"#EXT-X-BYTERANGE:{length}" + ("@0" if index == 0 else ""), "stream.ts"]
+            else: lines += [f"#EXTINF:{self.target_duration}.000,", f"seg{index:05d}.ts"]
+        return "\n".join(lines + ["#EXT-X-ENDLIST"]) + "\n"
+
+    def should_fail(self, path):
+        """경로마다 한 번만, 해시로 정한 error_rate 비율만큼 실패시킵니다 (실행마다 같은 경로가 실패)."""
+        if not self.error_rate: return False
+        bucket = int.from_bytes(hashlib.md5(path.encode()).digest()[:4], "big") / 2**32
+        with self._lock:
+            if bucket >= self.error_rate or path in self._failed: return False
+            self._failed.add(path); self.errors_sent += 1; return True
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True # 헤더/본문을 따로 보내므로, 켜 두면 keep-alive 요청마다 delayed ACK(~40ms)가 측정에 섞임
+
+    def log_message(self, fmt, *args): pass
+
+    def _send(self, status, body=b"", content_type="application/octet-stream", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type); self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items(): self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD": self.wfile.write(body)
+
+    def do_HEAD(self): self.do_GET()
+
+    def do_GET(self):
+        hls = self.server.hls; path = urlparse(self.path).path
+        routed = re.fullmatch(r"/[\w-]+/(\d+p/.*)", path) # /page/ID 가 가리키는 영상별 경로도 같은 스트림으로
+        if routed: path = "/" + routed.group(1)
+        with hls._lock: hls.requests += 1
+        if hls.latency_s: time.sleep(hls.latency_s)
+        if hls.should_fail(path): return self._send(503, b"injected error", "text/plain")
+        base = f"http://{self.server.server_address[0]}:{self.server.server_address[1]}"
+        if path == "/master.m3u8": return self._send(200, hls.master_playlist().encode(), "application/vnd.apple.mpegurl")
+        match = re.fullmatch(r"/\d+p/video\.m3u8", path)
+        if match: return self._send(200, hls.media_playlist().encode(), "application/vnd.apple.mpegurl")
+        match = re.fullmatch(r"/\d+p/seg(\d+)\.ts", path)
+        if match and int(match.group(1)) < hls.segments: return self._send(200, hls.segment(int(match.group(1))), "video/mp2t")
+        if re.fullmatch(r"/\d+p/stream\.ts", path):
+            data = hls.resource(); match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+            if not match: return self._send(200, data, "video/mp2t")
+            start = int(match.group(1)); end = min(int(match.group(2) or len(data) - 1), len(data) - 1)
+            return self._send(206, data[start:end + 1], "video/mp2t", {"Content-Range": f"bytes {start}-{end}/{len(data)}"})
+        match = re.fullmatch(r"/\d+p/key(\d+)\.bin", path)
+        if match: return self._send(200, hls.key(int(match.group(1))))
+        match = re.fullmatch(r"/page/([\w-]+)", path)
+        if match: return self._send(200, missav_page(f"{base}/{match.group(1)}/1080p/video.m3u8", match.group(1)).encode(), "text/html; charset=utf-8")
+        self._send(404, b"not found", "text/plain")
+
+def serve(hls, host="127.0.0.1", port=0):
+    """백그라운드 스레드에서 서버를 띄우고 (server, base_url)을 돌려줍니다. 끝낼 때는 server.shutdown()."""
+    server = ThreadingHTTPServer((host, port), _Handler); server.hls = hls; server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="BenchHLS", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크용 합성 HLS 서버")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--segments", type=int, default=100)
+    parser.add_argument("--size", type=int, default=188_000, help="세그먼트 크기(바이트)")
+    parser.add_argument("--encrypt", choices=("none", "aes"), default="none")
+    parser.add_argument("--rotate", type=int, default=0, help="키를 바꿀 세그먼트 간격")
+    parser.add_argument("--explicit-iv", action="store_true")
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--byterange", action="store_true", help="세그먼트를 stream.ts 한 파일의 EXT-X-BYTERANGE 구간으로")
+    args = parser.parse_args()
+    hls = SyntheticHLS(args.segments, args.size, None if args.encrypt == "none" else args.encrypt, args.rotate, args.explicit_iv, args.latency_ms, args.error_rate,
+                       byterange=args.byterange)
+    server, base = serve(hls, port=args.port)
+    print(json.dumps({"master": f"{base}/master.m3u8", "media": f"{base}/1080p/video.m3u8", "page": f"{base}/page/bench-001"}))
+    try:
+        while True: time.sleep(3600)
+    except KeyboardInterrupt: server.shutdown()
+
+if __name__ == "__main__":
+    main()
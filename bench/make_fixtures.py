@@ -0,0 +1,35 @@
+# coding: utf8
+"""bench/fixtures/ 의 MissAV 형식 페이지를 다시 만듭니다. 실제 저장된 페이지처럼 광고/추적 스크립트와 본문 HTML을 섞습니다.
+결과는 고정이므로 평소에는 커밋된 파일을 그대로 쓰고, 형식을 바꿀 때만 실행하세요."""
+import json
+import os
+
+from hls_server import missav_page, pack_js
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SURRIT = "https://surrit.com/{}/playlist.m3u8"
+CASES = {
+    "missav_basic.html": dict(video_id="sone-101", uuid="5a0c7a8e-8d4b-4a5f-9a21-3e1f0b6c2d11", radix=36, decoys=1, filler=0),
+    "missav_base62.html": dict(video_id="ipx-202", uuid="0f3e9b77-2c1a-4d8e-b6a4-71c9d2e5f803", radix=62, decoys=2, filler=40),
+    "missav_large.html": dict(video_id="ssis-303", uuid="c81d4e2f-6b0a-4f39-8e57-9a2b1c3d4e5f", radix=62, decoys=6, filler=1500),
+}
+
+def filler_html(count):
+    """추천 영상 목록 같은 본문. 페이지 크기를 실제(수백 KB)와 비슷하게 맞추는 용도."""
+    return "\n".join(f'<div class="thumbnail group"><a href="https://missav.ws/ko/abc-{i:03d}"><img src="https://fourhoi.com/abc-{i:03d}/cover-t.jpg" '
+                     f'alt="ABC-{i:03d}" loading="lazy"></a><div class="my-2 text-sm">ABC-{i:03d} 추천 영상 {i}</div></div>' for i in range(count))
+
+def main():
+    expected = {}
+    for name, case in CASES.items():
+        url = SURRIT.format(case["uuid"])
+        page = missav_page(url, case["video_id"], case["radix"], case["decoys"])
+        if case["filler"]:
+            tracker = pack_js(" ".join(f"window.t{i}=function(a{i},b{i}){{return a{i}+b{i}+{i}}};" for i in range(case["filler"] // 10)), case["radix"])
+            page = page.replace("</body>", f"{filler_html(case['filler'])}\n<script>{tracker}</script>\n</body>")
+        with open(os.path.join(FIXTURE_DIR, name), "w", encoding="utf-8", newline="\n") as f: f.write(page)
+        expected[name] = url
+    with open(os.path.join(FIXTURE_DIR, "expected.json"), "w", encoding="utf-8", newline="\n") as f: json.dump(expected, f, indent=2); f.write("\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+# coding: utf8
+"""오프라인 성능 벤치마크. 네트워크 없이 로컬 합성 HLS 서버(hls_server.py)와 저장된 페이지(fixtures/)만 사용합니다.
+
+    python bench/run_bench.py --out bench-6.3.16.json
+    python bench/run_bench.py --out new.json --compare bench-6.3.16.json
+
+항목:
+  segments_plain / segments_aes / segments_aes_rotate  sogirl download_and_decrypt_segment (+ ffmpeg가 있으면 concatenate_segments)
+  segments_byterange                                    같은 내용을 stream.ts 한 파일의 EXT-X-BYTERANGE 구간으로 (이어진 구간을 묶은 Range 요청)
+  get_best_m3u8                                         sogirl 마스터 플레이리스트 선택
+  deobfuscate                                           missav find_packed_scripts + deobfuscate_missav_source (fixtures)
+  scheduler                                             missav DownloaderCore 분석→대기열→yt-dlp 전체 (yt-dlp가 있을 때)
+  startup                                               새 프로세스에서 missav import → 창 표시(디스플레이가 있을 때) → 첫 분석(HTTP 빠른경로)까지
+결과 JSON은 버전 간 비교용입니다. 같은 기계에서 같은 옵션으로 잰 결과끼리만 비교하세요.
+"""
+import argparse
+import importlib.machinery
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+import requests
+
+from hls_server import SyntheticHLS, serve
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+MISSAV_PATH = os.path.join(REPO_DIR, "missav_6.3.16")
+SOGIRL_ZIP, SOGIRL_MEMBER = os.path.join(REPO_DIR, "py sogirl downloader.zip"), "py sogirl downloader.py"
+BENCHMARKS = ("segments_plain", "segments_aes", "segments_aes_rotate", "segments_byterange", "get_best_m3u8", "deobfuscate", "scheduler", "startup")
+STARTUP_PROBE = """
+import json, os, sys, time
+started = time.perf_counter()
+import importlib.machinery, importlib.util
+loader = importlib.machinery.SourceFileLoader("missav_startup", sys.argv[1])
+module = importlib.util.module_from_spec(importlib.util.spec_from_loader("missav_startup", loader)); loader.exec_module(module)
+result = {"import_s": time.perf_counter() - started}
+for name in ("ANALYSIS_CACHE_FILENAME", "METRICS_JSONL_FILENAME", "LIBRARY_DB_FILENAME", "DRIVER_PATH_CACHE_FILENAME", "LOG_FILENAME"):
+    setattr(module, name, os.path.abspath(getattr(module, name))) # 스크립트 폴더 대신 작업 폴더에 (LOG_FILENAME이 절대 경로면 페이지 소스도 그 폴더에)
+module.JOB_STORE_ENABLED = module.API_SERVER_ENABLED = False
+core = None
+if module.tk is not None and (os.name == "nt" or sys.platform == "darwin" or os.environ.get("DISPLAY")):
+    try: root = module.tk.Tk()
+    except module.tk.TclError: root = None
+    if root:
+        core = module.VideoDownloaderApp(root, module.DownloaderCore(os.getcwd())).core; root.update()
+        result["window_s"] = time.perf_counter() - started
+core = core or module.DownloaderCore(os.getcwd())
+result["ready_s"] = time.perf_counter() - started
+result["heavy_modules_at_ready"] = sorted(name for name in ("selenium", "requests", "webdriver_manager") if name in sys.modules)
+links, _ = core.resolve_m3u8_links(sys.argv[2], "bench-001", "bench")
+result["first_analysis_s"] = time.perf_counter() - started; result["links"] = len(links)
+print(json.dumps(result)); sys.stdout.flush()
+os._exit(0) # 드라이버 풀/로그 스레드 정리 시간은 재지 않음
+"""
+
+def load_missav():
+    loader = importlib.machinery.SourceFileLoader("missav_bench", MISSAV_PATH)
+    module = importlib.util.module_from_spec(importlib.util.spec_from_loader("missav_bench", loader))
+    loader.exec_module(module)
+    return module
+
+def load_sogirl(workdir):
+    path = os.path.join(workdir, "sogirl_bench.py")
+    with zipfile.ZipFile(SOGIRL_ZIP) as zf, open(path, "wb") as f: f.write(zf.read(SOGIRL_MEMBER))
+    spec = importlib.util.spec_from_file_location("sogirl_bench", path)
+    module = importlib.util.module_from_spec(spec); spec.loader.exec_module(module)
+    return module
+
+def tool_version(name, flag="--version"):
+    if not shutil.which(name): return None
+    try: return subprocess.run([name, flag], capture_output=True, text=True, timeout=30).stdout.splitlines()[0].strip()
+    except (OSError, subprocess.SubprocessError, IndexError): return "unknown"
+
+def git_revision():
+    try: return subprocess.run(["git", "-C", REPO_DIR, "describe", "--always", "--dirty"], capture_output=True, text=True, timeout=30).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError): return None
+
+def measure(run, repeat, warmup=1):
+    """run()을 warmup회 버리고 repeat회 잽니다. run()이 dict를 돌려주면 마지막 값을 extra로 남깁니다."""
+    for _ in range(warmup): run()
+    runs, extra = [], None
+    for _ in range(repeat):
+        started = time.perf_counter(); extra = run(); runs.append(time.perf_counter() - started)
+    result = {"median_s": round(statistics.median(runs), 6), "min_s": round(min(runs), 6), "runs": [round(r, 6) for r in runs]}
+    if isinstance(extra, dict): result.update(extra)
+    return result
+
+def real_ts_clip(workdir):
+    """ffmpeg가 있으면 concat이 실제로 동작하도록 진짜 MPEG-TS 조각을 만듭니다. 없으면 None (합성 패킷 사용, concat 생략)."""
+    if not shutil.which("ffmpeg"): return None
+    path = os.path.join(workdir, "clip.ts")
+    cmd = ["ffmpeg", "-y", "-loglevel", "error", "-f", "lavfi", "-i", "testsrc=size=640x360:rate=25", "-t", "2", "-c:v", "mpeg2video", "-b:v", "2M", "-f", "mpegts", path]
+    try:
+        subprocess.run(cmd, check=True, capture_output=True, timeout=120)
+        with open(path, "rb") as f: clip = f.read()
+    except (OSError, subprocess.SubprocessError): return None
+    return clip if clip[:1] == b"\x47" else None
+
+def new_session(sogirl):
+    session = requests.Session()
+    session.headers.update({"User-Agent": sogirl.USER_AGENT})
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=sogirl.MAX_WORKERS_LIMIT))
+    return session
+
+def bench_segments(sogirl, args, workdir, clip, encrypt=None, rotate=0, byterange=False):
+    hls = SyntheticHLS(args.segments, args.segment_size, encrypt, rotate, latency_ms=args.latency_ms, error_rate=args.error_rate, byterange=byterange)
+    hls.payload_override = clip
+    server, base = serve(hls); playlist_url = f"{base}/1080p/video.m3u8"
+    def run():
+        hls._failed.clear() # 매 회 같은 세그먼트가 다시 한 번씩 실패하도록
+        session = new_session(sogirl)
+        segments = sogirl.parse_media_playlist(playlist_url, session.get(playlist_url).text).segment_requests()
+        key_cache = sogirl.KeyCache(session); controller = sogirl.AdaptiveConcurrency(); validator = sogirl.SegmentValidator()
+        temp_dir = tempfile.mkdtemp(prefix="segments_", dir=workdir)
+        tasks = {i: (segments[i], key_cache, session, temp_dir, i, len(segments), controller, validator) for i in range(len(segments))}
+        requests_before = hls.requests
+        def on_result(index, future):
+            if not future.result(): raise RuntimeError(f"세그먼트 {index} 실패")
+        started = time.perf_counter()
+        sogirl.run_segment_tasks(range(len(segments)), lambda i: sogirl.download_and_decrypt_segment(tasks[i]), on_result, controller)
+        download_s = time.perf_counter() - started; http_requests = hls.requests - requests_before
+        total_bytes = sum(os.path.getsize(os.path.join(temp_dir, f"{i:05d}.ts")) for i in range(len(segments)))
+        if total_bytes != args.segments * len(hls.plain_segment(0)): raise RuntimeError(f"복호화 결과 크기 불일치 ({total_bytes})")
+        concat_s = None
+        if clip is not None:
+            started = time.perf_counter()
+            if not sogirl.concatenate_segments(temp_dir, os.path.join(workdir, "concat.mp4"), len(segments)): raise RuntimeError("concatenate_segments 실패")
+            concat_s = time.perf_counter() - started
+        shutil.rmtree(temp_dir)
+        return {"download_s": round(download_s, 6), "concat_s": round(concat_s, 6) if concat_s is not None else None,
+                "bytes": total_bytes, "mib_per_s": round(total_bytes / download_s / 1048576, 2), "final_concurrency": controller.current,
+                "http_requests": http_requests, "refetched": validator.refetched}
+    try: return measure(run, args.repeat)
+    finally: server.shutdown()
+
+def bench_get_best_m3u8(sogirl, args):
+    hls = SyntheticHLS(latency_ms=args.latency_ms); server, base = serve(hls)
+    session = new_session(sogirl); calls = 50
+    def run():
+        for _ in range(calls):
+            if not sogirl.get_best_m3u8(f"{base}/master.m3u8", base, session).endswith("/1080p/video.m3u8"): raise RuntimeError("최고 화질을 고르지 못함")
+        return {"calls": calls}
+    try:
+        result = measure(run, args.repeat); result["per_call_ms"] = round(result["median_s"] / calls * 1000, 3); return result
+    finally: server.shutdown()
+
+def bench_deobfuscate(missav, core, args):
+    with open(os.path.join(FIXTURE_DIR, "expected.json"), encoding="utf-8") as f: expected = json.load(f)
+    pages = {}
+    for name in expected:
+        with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f: pages[name] = f.read()
+    loops = 20
+    def run():
+        per_page = {}
+        for name, source in pages.items():
+            started = time.perf_counter()
+            for _ in range(loops):
+                found = [core.deobfuscate_missav_source(p, "|".join(k), r, c) for p, r, c, k in missav.find_packed_scripts(source)]
+            if expected[name] not in found: raise RuntimeError(f"{name}: 기대한 M3U8을 찾지 못함 ({found})")
+            per_page[name] = round((time.perf_counter() - started) / loops * 1000, 3)
+        return {"per_page_ms": per_page, "page_bytes": {name: len(source) for name, source in pages.items()}}
+    return measure(run, args.repeat)
+
+def bench_scheduler(missav, args, workdir):
+    if not shutil.which("yt-dlp"): return {"skipped": "yt-dlp 없음"}
+    hls = SyntheticHLS(args.scheduler_segments, args.segment_size, "aes", latency_ms=args.latency_ms); server, base = serve(hls)
+    urls = [f"{base}/page/bench-{i:03d}" for i in range(args.scheduler_jobs)]
+    def run():
+        out_dir = tempfile.mkdtemp(prefix="scheduler_", dir=workdir)
+        core = missav.DownloaderCore(out_dir, args.jobs, args.analysis_jobs)
+        try:
+            for url in urls: core.submit_url(url)
+            if not core.wait_idle(timeout=600): raise RuntimeError("스케줄러가 시간 안에 끝나지 않음")
+            done = sum(1 for job in core.list_jobs() if job["state"] == "done")
+            if done != len(urls): raise RuntimeError(f"완료 {done}/{len(urls)}")
+        finally: core.shutdown(); shutil.rmtree(out_dir, ignore_errors=True)
+        return {"jobs": len(urls)}
+    try:
+        result = measure(run, args.repeat, warmup=0); result["jobs_per_s"] = round(len(urls) / result["median_s"], 3); return result
+    finally: server.shutdown()
+
+def bench_startup(args, workdir):
+    """매번 새 파이썬 프로세스로 재므로 import 캐시의 영향이 없습니다. 분석은 로컬 /page/ID를 HTTP 빠른경로로 해제합니다."""
+    hls = SyntheticHLS(latency_ms=args.latency_ms); server, base = serve(hls)
+    probe_dir = tempfile.mkdtemp(prefix="startup_", dir=workdir)
+    def probe():
+        proc = subprocess.run([sys.executable, "-c", STARTUP_PROBE, MISSAV_PATH, f"{base}/page/bench-001"], cwd=probe_dir,
+                              capture_output=True, text=True, timeout=120)
+        if proc.returncode != 0: raise RuntimeError(f"startup probe 실패: {proc.stderr.strip()[-500:]}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        if not result["links"]: raise RuntimeError("첫 분석에서 M3U8을 찾지 못함")
+        return result
+    try:
+        probe() # 디스크 캐시 예열
+        runs = [probe() for _ in range(args.repeat)]
+    finally: server.shutdown()
+    result = {"median_s": round(statistics.median(r["first_analysis_s"] for r in runs), 6), "runs": [round(r["first_analysis_s"], 6) for r in runs]}
+    for key in ("import_s", "window_s", "ready_s"):
+        if key in runs[0]: result[f"{key[:-2]}_median_s"] = round(statistics.median(r[key] for r in runs), 6)
+    result["heavy_modules_at_ready"] = runs[-1]["heavy_modules_at_ready"]
+    return result
+
+def compare(current, baseline_path, threshold):
+    """두 결과 파일의 중앙값을 비교해 표로 출력하고, threshold(%)보다 느려진 항목 수를 돌려줍니다."""
+    with open(baseline_path, encoding="utf-8") as f: baseline = json.load(f)
+    regressions = 0
+    print(f"\n비교 기준: {baseline_path} ({baseline['meta'].get('git')}) → 현재 ({current['meta'].get('git')})")
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name, {})
+        if "median_s" not in result or "median_s" not in old: continue
+        change = (result["median_s"] - old["median_s"]) / old["median_s"] * 100
+        mark = "  <-- 느려짐" if change > threshold else ""
+        regressions += change > threshold
+        print(f"  {name:22s} {old['median_s']:9.4f}s → {result['median_s']:9.4f}s  {change:+6.1f}%{mark}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="MissAV/sogirl 오프라인 벤치마크")
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help=f"쉼표로 구분 ({','.join(BENCHMARKS)})")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--segments", type=int, default=200)
+    parser.add_argument("--segment-size", type=int, default=188_000, help="합성 세그먼트 크기(바이트). ffmpeg가 있으면 실제 TS 조각 크기를 따름")
+    parser.add_argument("--latency-ms", type=int, default=5, help="요청마다 넣을 서버 지연")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="세그먼트별 첫 요청을 503으로 돌려줄 비율")
+    parser.add_argument("--scheduler-jobs", type=int, default=6)
+    parser.add_argument("--scheduler-segments", type=int, default=20)
+    parser.add_argument("--jobs", type=int, default=2, help="스케줄러 동시 다운로드 수")
+    parser.add_argument("--analysis-jobs", type=int, default=2)
+    parser.add_argument("--label", default=None, help="결과에 남길 이름 (기본: git describe)")
+    parser.add_argument("--out", help="결과 JSON 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=10.0, help="느려짐으로 볼 중앙값 증가율(%%)")
+    args = parser.parse_args()
+    selected = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown: parser.error(f"알 수 없는 항목: {', '.join(sorted(unknown))}")
+
+    workdir = tempfile.mkdtemp(prefix="m3u8dl_bench_")
+    cwd = os.getcwd(); os.chdir(workdir) # 스크립트가 만드는 로그/캐시 파일을 작업 폴더에 가두기
+    try:
+        sogirl = load_sogirl(workdir) if any(n.startswith("segments") or n == "get_best_m3u8" for n in selected) else None
+        missav = core = None
+        if "deobfuscate" in selected or "scheduler" in selected:
+            missav = load_missav()
+            missav.ANALYSIS_CACHE_FILENAME = os.path.join(workdir, "analysis_cache.json") # 절대 경로면 스크립트 폴더 대신 여기에
+            missav.METRICS_JSONL_FILENAME = os.path.join(workdir, "metrics.jsonl"); missav.LOG_FILENAME = os.path.join(workdir, "debug.txt")
+            missav.LIBRARY_DB_FILENAME = os.path.join(workdir, "library.sqlite3"); missav.DRIVER_PATH_CACHE_FILENAME = os.path.join(workdir, "chromedriver.json")
+            core = missav.DownloaderCore(workdir)
+        clip = real_ts_clip(workdir) if sogirl else None
+        meta = {"label": args.label or git_revision(), "git": git_revision(), "python": platform.python_version(), "platform": platform.platform(),
+                "cpu_count": os.cpu_count(), "ffmpeg": tool_version("ffmpeg", "-version"), "yt_dlp": tool_version("yt-dlp"),
+                "segment_payload": "ffmpeg testsrc" if clip else "synthetic null packets (concat 생략)",
+                "params": {k: v for k, v in vars(args).items() if k not in ("out", "compare", "only", "label")}}
+        runners = {
+            "segments_plain": lambda: bench_segments(sogirl, args, workdir, clip),
+            "segments_aes": lambda: bench_segments(sogirl, args, workdir, clip, "aes"),
+            "segments_aes_rotate": lambda: bench_segments(sogirl, args, workdir, clip, "aes", rotate=max(1, args.segments // 10)),
+            "segments_byterange": lambda: bench_segments(sogirl, args, workdir, clip, "aes", byterange=True),
+            "get_best_m3u8": lambda: bench_get_best_m3u8(sogirl, args),
+            "deobfuscate": lambda: bench_deobfuscate(missav, core, args),
+            "scheduler": lambda: bench_scheduler(missav, args, workdir),
+            "startup": lambda: bench_startup(args, workdir),
+        }
+        results = {}
+        for name in selected:
+            print(f"[bench] {name} ...", flush=True)
+            results[name] = runners[name]()
+            summary = {k: v for k, v in results[name].items() if k != "runs"}
+            print(f"[bench] {name}: {json.dumps(summary, ensure_ascii=False)}", flush=True)
+        if core: core.shutdown()
+    finally:
+        os.chdir(cwd); shutil.rmtree(workdir, ignore_errors=True)
+    current = {"meta": meta, "results": results}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f: json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"[bench] 결과 저장: {args.out}")
+    if args.compare and compare(current, args.compare, args.threshold): return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())